@@ -1,66 +1,157 @@
+import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 
-def create_price_chart(data: pd.DataFrame, symbol: str, chart_params: dict = None) -> go.Figure:
+from utils.data_fetcher import data_fingerprint
+from utils.indicators import multi_sma, rolling_mean_std
+
+# Switch line overlays to WebGL rendering above this many rows
+SCATTERGL_MIN_ROWS = 1000
+
+# Aggregate longer histories down to roughly the chart's pixel width
+DOWNSAMPLE_MAX_POINTS = 2000
+
+# Static layout and axis styling, built once at import instead of on every rerun
+_GRID_COLOR = 'rgba(128, 128, 128, 0.1)'
+_ZEROLINE_COLOR = 'rgba(128, 128, 128, 0.2)'
+
+_LAYOUT = dict(
+    height=533,
+    showlegend=True,
+    xaxis_rangeslider_visible=False,
+    template='plotly_dark',
+    margin=dict(t=30, b=30),
+    dragmode='pan',
+    yaxis=dict(
+        title="Price",
+        gridcolor=_GRID_COLOR,
+        zerolinecolor=_ZEROLINE_COLOR,
+        domain=[0.2, 1],
+        fixedrange=False,
+        autorange=True,
+        rangemode='normal'
+    ),
+    yaxis2=dict(
+        title="Volume",
+        gridcolor=_GRID_COLOR,
+        zerolinecolor=_ZEROLINE_COLOR,
+        tickformat='.2s',
+        domain=[0, 0.18],
+        fixedrange=True
+    ),
+    newshape=dict(line_color='yellow'),
+    hovermode='x unified',
+    selectdirection='h',
+    clickmode='event+select'
+)
+
+_AXIS_STYLE = dict(
+    gridcolor=_GRID_COLOR,
+    showspikes=True,
+    spikemode='across',
+    spikesnap='cursor',
+    showline=True,
+    showgrid=True
+)
+
+def _bucket_bounds(n_rows: int, n_out: int) -> tuple:
+    """
+    First and last row positions of n_out contiguous, near-equal buckets
+    """
+    starts = (np.arange(n_out) * n_rows) // n_out
+    ends = np.append(starts[1:], n_rows) - 1
+    return starts, ends
+
+def _downsample_ohlcv(data: pd.DataFrame, n_out: int = DOWNSAMPLE_MAX_POINTS) -> pd.DataFrame:
+    """
+    Aggregate OHLCV rows into at most n_out candles (first/max/min/last/sum per bucket)
+    """
+    if len(data) <= n_out:
+        return data
+
+    starts, ends = _bucket_bounds(len(data), n_out)
+    return pd.DataFrame(
+        {
+            'open': data['open'].to_numpy()[starts],
+            'high': np.maximum.reduceat(data['high'].to_numpy(), starts),
+            'low': np.minimum.reduceat(data['low'].to_numpy(), starts),
+            'close': data['close'].to_numpy()[ends],
+            'volume': np.add.reduceat(data['volume'].to_numpy(), starts),
+        },
+        index=data.index[starts]
+    )
+
+def create_price_chart(data: pd.DataFrame, symbol: str, chart_params: dict = None, timeframe: str = None) -> go.Figure:
     """
     Create an interactive price chart with volume and optional overlays
     """
+    # Build cheap, hashable cache keys so reruns with unchanged inputs reuse the figure
+    data_hash = data_fingerprint(data)
+    params_tuple = tuple(sorted(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in (chart_params or {}).items()
+    ))
+    return _build_fig(data_hash, data, symbol, params_tuple, timeframe)
+
+@st.cache_data(ttl=60, max_entries=16, show_spinner=False)
+def _build_fig(data_hash: tuple, _data: pd.DataFrame, symbol: str, params_tuple: tuple, timeframe: str = None) -> go.Figure:
+    """
+    Build the price chart figure; cached on the data hash and normalized chart params
+    """
+    chart_params = dict(params_tuple)
+
     # Verify volume data
-    if 'volume' not in data.columns or data['volume'].isnull().all():
+    if 'volume' not in _data.columns or _data['volume'].isnull().all():
         raise ValueError("Volume data is missing or invalid")
     
-    # Set volume range
-    min_volume = data['volume'].max() * 0.001
-    volume_data = data['volume'].where(data['volume'] > min_volume, min_volume)
-    volume_max = volume_data.max()
+    # Downsample long histories unless asked not to; overlays are still computed on the
+    # full-resolution close and sampled at each bucket's last row so they line up with the candle closes
+    full_close = _data['close']
+    data = _data if chart_params.get('full_resolution') else _downsample_ohlcv(_data)
+    overlay_rows = _bucket_bounds(len(_data), len(data))[1] if len(data) < len(_data) else slice(None)
+    
+    # Pull each column out once; every trace below works on these plain arrays
+    o, h, l, c, volume = (data[col].to_numpy() for col in ('open', 'high', 'low', 'close', 'volume'))
+    idx = data.index.to_numpy()
     
-    # Calculate price range
-    price_min = float(data['low'].min())
-    price_max = float(data['high'].max())
-    price_range = price_max - price_min
-    y_axis_range = (price_min - (price_range * 0.1), price_max + (price_range * 0.1))
-    volume_range = (0, volume_max * 1.1)
+    # Set volume range
+    min_volume = np.nanmax(volume) * 0.001
+    # fmax also lifts NaN volumes to the floor, like the previous mask-and-select did
+    volume_data = np.fmax(volume, min_volume)
     
     # Calculate price colors
-    colors = ['red' if close < open else 'green' 
-              for open, close in zip(data['open'], data['close'])]
+    colors = np.where(c < o, 'red', 'green')
     
-    # Create figure with secondary y-axis
-    fig = make_subplots(
-        rows=2, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        subplot_titles=(f'{symbol} Price', 'Volume'),
-        row_heights=[0.825, 0.175]
-    )
-
-    # Candlestick chart
-    fig.add_trace(
+    # Candlestick has no WebGL equivalent, but the line overlays do
+    scatter_cls = go.Scattergl if len(data) >= SCATTERGL_MIN_ROWS else go.Scatter
+    
+    # Candlestick chart; float32 halves the serialized payload at no visible cost
+    price_traces = [
         go.Candlestick(
-            x=data.index,
-            open=data['open'],
-            high=data['high'],
-            low=data['low'],
-            close=data['close'],
+            x=idx,
+            open=o.astype(np.float32),
+            high=h.astype(np.float32),
+            low=l.astype(np.float32),
+            close=c.astype(np.float32),
             name='OHLC'
-        ),
-        row=1, col=1
-    )
+        )
+    ]
 
     # Add Moving Averages if requested
     if chart_params and chart_params.get('show_ma') and chart_params.get('ma_periods'):
-        for period in chart_params['ma_periods']:
-            ma = data['close'].rolling(window=period).mean()
-            fig.add_trace(
-                go.Scatter(
-                    x=data.index,
-                    y=ma,
+        ma_periods = chart_params['ma_periods']
+        # All requested periods in a single pass over close
+        mas = multi_sma(full_close.to_numpy(dtype=np.float64), np.asarray(ma_periods, dtype=np.int64))
+        for col, period in enumerate(ma_periods):
+            price_traces.append(
+                scatter_cls(
+                    x=idx,
+                    y=mas[overlay_rows, col],
                     name=f'MA{period}',
                     line=dict(width=1.5)
-                ),
-                row=1, col=1
+                )
             )
 
     # Add Bollinger Bands if requested
@@ -68,47 +159,33 @@ def create_price_chart(data: pd.DataFrame, symbol: str, chart_params: dict = Non
         period = chart_params.get('bb_period', 20)
         std_dev = chart_params.get('bb_std', 2.0)
         
-        middle_band = data['close'].rolling(window=period).mean()
-        std = data['close'].rolling(window=period).std()
+        # One pass for both mean and std instead of two rolling reductions
+        middle_band, std = rolling_mean_std(full_close.to_numpy(dtype=np.float64), int(period))
+        middle_band = middle_band[overlay_rows]
+        std = std[overlay_rows]
         upper_band = middle_band + (std * std_dev)
         lower_band = middle_band - (std * std_dev)
         
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=upper_band,
-                name='Upper BB',
-                line=dict(dash='dash', width=1),
-                opacity=0.7
-            ),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=middle_band,
-                name='Middle BB',
+        # Draw upper, middle and lower bands as one trace, separated by NaN gaps
+        gap_x = idx[-1:]
+        gap_y = np.array([np.nan])
+        price_traces.append(
+            scatter_cls(
+                x=np.concatenate([idx, gap_x, idx, gap_x, idx]),
+                y=np.concatenate([upper_band, gap_y, middle_band, gap_y, lower_band]),
+                mode='lines',
+                name='Bollinger Bands',
                 line=dict(dash='dash', width=1),
+                connectgaps=False,
                 opacity=0.7
-            ),
-            row=1, col=1
-        )
-        fig.add_trace(
-            go.Scatter(
-                x=data.index,
-                y=lower_band,
-                name='Lower BB',
-                line=dict(dash='dash', width=1),
-                opacity=0.7
-            ),
-            row=1, col=1
+            )
         )
 
     # Volume chart with color coding
-    fig.add_trace(
+    volume_traces = [
         go.Bar(
-            x=data.index,
-            y=volume_data,
+            x=idx,
+            y=volume_data.astype(np.float32),
             name='Volume',
             marker=dict(
                 color=colors,
@@ -116,59 +193,30 @@ def create_price_chart(data: pd.DataFrame, symbol: str, chart_params: dict = Non
                 line=dict(width=1, color='rgba(255, 255, 255, 0.5)')
             ),
             width=0.8
-        ),
-        row=2, col=1
+        )
+    ]
+
+    # Create figure with secondary y-axis and add every trace in one batch
+    fig = make_subplots(
+        rows=2, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.03,
+        subplot_titles=(f'{symbol} Price', 'Volume'),
+        row_heights=[0.825, 0.175]
+    )
+    fig.add_traces(
+        price_traces + volume_traces,
+        rows=[1] * len(price_traces) + [2] * len(volume_traces),
+        cols=1
     )
 
     # Update layout for better visualization
-    fig.update_layout(
-        height=533,
-        showlegend=True,
-        xaxis_rangeslider_visible=False,
-        template='plotly_dark',
-        margin=dict(t=30, b=30),
-        dragmode='pan',
-        yaxis=dict(
-            title="Price",
-            gridcolor='rgba(128, 128, 128, 0.1)',
-            zerolinecolor='rgba(128, 128, 128, 0.2)',
-            domain=[0.2, 1],
-            fixedrange=False,
-            autorange=True,
-            rangemode='normal'
-        ),
-        yaxis2=dict(
-            title="Volume",
-            gridcolor='rgba(128, 128, 128, 0.1)',
-            zerolinecolor='rgba(128, 128, 128, 0.2)',
-            tickformat='.2s',
-            domain=[0, 0.18],
-            fixedrange=True
-        ),
-        newshape=dict(line_color='yellow'),
-        hovermode='x unified',
-        selectdirection='h',
-        clickmode='event+select'
-    )
+    # Keep the user's zoom and pan while reruns redraw the same series with new data or overlays;
+    # another symbol or timeframe starts from a fresh view
+    fig.update_layout(_LAYOUT, uirevision=f"{symbol}-{timeframe}")
 
     # Update axes for better gridlines
-    fig.update_xaxes(
-        gridcolor='rgba(128, 128, 128, 0.1)',
-        showspikes=True,
-        spikemode='across',
-        spikesnap='cursor',
-        showline=True,
-        showgrid=True
-    )
-    
-    fig.update_yaxes(
-        gridcolor='rgba(128, 128, 128, 0.1)',
-        showspikes=True,
-        spikemode='across',
-        spikesnap='cursor',
-        showline=True,
-        showgrid=True,
-        row=1, col=1
-    )
+    fig.update_xaxes(_AXIS_STYLE)
+    fig.update_yaxes(_AXIS_STYLE, row=1, col=1)
 
     return fig
@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 
-def display_metrics(data: pd.DataFrame, signals: list):
+from components.signals import signal_stats
+
+@st.fragment
+def display_metrics(data: pd.DataFrame, signals: list, stats: dict = None):
     """
     Display trading metrics and statistics
     """
@@ -10,8 +14,11 @@ def display_metrics(data: pd.DataFrame, signals: list):
         return
 
     # Calculate basic metrics
-    latest_price = data['close'].iloc[-1]
-    price_change = ((latest_price - data['close'].iloc[0]) / data['close'].iloc[0]) * 100
+    close = data['close'].to_numpy()
+    latest_price = close[-1]
+    first_price = close[0]
+    price_change = ((latest_price - first_price) / first_price) * 100
+    volume_24 = np.nansum(data['volume'].to_numpy(dtype=np.float64)[-24:])
     
     # Display metrics in columns
     col1, col2, col3 = st.columns(3)
@@ -26,7 +33,7 @@ def display_metrics(data: pd.DataFrame, signals: list):
     with col2:
         st.metric(
             label="24h Volume",
-            value=f"${data['volume'].tail(24).sum():,.0f}"
+            value=f"${volume_24:,.0f}"
         )
     
     with col3:
@@ -39,8 +46,9 @@ def display_metrics(data: pd.DataFrame, signals: list):
     # Trading statistics
     st.subheader("Trading Statistics")
     
-    buy_signals = len([s for s in signals if s['action'] == 'BUY'])
-    sell_signals = len([s for s in signals if s['action'] == 'SELL'])
+    if stats is None:
+        stats = signal_stats(signals)
+    buy_signals, sell_signals = stats['buy'], stats['sell']
     
     stats_col1, stats_col2 = st.columns(2)
     
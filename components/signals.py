@@ -1,6 +1,6 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import numpy as np
 
 def format_price(price):
     """Format price based on its magnitude"""
@@ -13,44 +13,74 @@ def format_price(price):
     else:  # Small numbers (<1)
         return f'${price:.6f}'   # 6 decimal places for small numbers
 
-def display_signals(signals: list):
+def _price_column_format(prices: np.ndarray) -> str:
+    """printf format for the price column; six decimals once any price is below 1, like format_price"""
+    abs_p = np.abs(prices[~np.isnan(prices)])
+    return '$%.6f' if abs_p.size and abs_p.min() < 1 else '$%.2f'
+
+def signal_stats(signals: list) -> dict:
+    """
+    BUY/SELL counts for a signal list
+    """
+    actions = np.fromiter((s['action'] for s in signals), dtype='U4', count=len(signals))
+    labels, counts = np.unique(actions, return_counts=True)
+    by_action = dict(zip(labels.tolist(), counts.tolist()))
+    return {
+        'total': len(signals),
+        'buy': by_action.get('BUY', 0),
+        'sell': by_action.get('SELL', 0)
+    }
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def signals_frame(data_hash, strategy_key, _signals: list) -> pd.DataFrame:
+    """
+    Signal table for one data/strategy combination; keyed like compute_signals, whose output
+    _signals is, so the frame is only rebuilt when the signals themselves can have changed
+    """
+    signals_df = pd.DataFrame(_signals, columns=['timestamp', 'price', 'action', 'indicator'])
+    # Strategies take timestamps from the DatetimeIndex, so the column is normally datetime64
+    # already; only convert when some other dtype was handed in
+    if signals_df['timestamp'].dtype.kind != 'M':
+        signals_df['timestamp'] = pd.to_datetime(signals_df['timestamp'])
+    return signals_df
+
+@st.fragment
+def display_signals(data: pd.DataFrame, signals_df: pd.DataFrame, stats: dict = None):
     """
     Display trading signals in a formatted table with improved styling
     """
-    if not signals:
+    if signals_df.empty:
         st.warning("No signals generated yet")
         return
-
-    # Create signals DataFrame
-    signals_df = pd.DataFrame(signals)
-    
-    # Format timestamp as datetime if it isn't already
-    if 'timestamp' in signals_df.columns and not pd.api.types.is_datetime64_any_dtype(signals_df['timestamp']):
-        signals_df['timestamp'] = pd.to_datetime(signals_df['timestamp'])
     
     # Format the table
     st.subheader("Trading Signals")
     
-    # Apply custom price formatting to the DataFrame
-    if 'price' in signals_df.columns:
-        signals_df['price'] = signals_df['price'].apply(format_price)
+    # Prices stay numeric; the grid formats only the rows it actually draws
+    price_format = _price_column_format(signals_df['price'].to_numpy(dtype=np.float64))
+    
+    # Color-code actions with a precomputed label column rather than per-cell styling;
+    # assign() leaves the caller's frame untouched
+    table = signals_df.assign(action=np.where(signals_df['action'].to_numpy() == 'BUY', '🟢 BUY', '🔴 SELL'))
     
     # Enhanced table display with better formatting
     st.dataframe(
-        signals_df,
+        table,
         use_container_width=True,
         height=400,
+        hide_index=True,
         column_config={
             "timestamp": st.column_config.DatetimeColumn(
                 "Time",
                 format="DD/MM/YY HH:mm",
                 help="Signal timestamp"
             ),
-            "price": st.column_config.TextColumn(
+            "price": st.column_config.NumberColumn(
                 "Price",
+                format=price_format,
                 help="Asset price at signal",
             ),
-            "action": st.column_config.Column(
+            "action": st.column_config.TextColumn(
                 "Action",
                 help="Buy or Sell signal"
             ),
@@ -62,27 +92,28 @@ def display_signals(signals: list):
     )
     
     # Add a summary section with metrics
-    if signals:
-        col1, col2, col3 = st.columns(3)
-        
-        # Calculate metrics
-        buy_signals = len([s for s in signals if s['action'] == 'BUY'])
-        sell_signals = len([s for s in signals if s['action'] == 'SELL'])
-        signal_rate = f"{(len(signals) / len(signals_df)) * 100:.1f}%" if len(signals_df) > 0 else "0%"
-        
-        # Display metrics
-        with col1:
-            st.metric("Buy Signals", buy_signals)
-        with col2:
-            st.metric("Sell Signals", sell_signals)
-        with col3:
-            st.metric("Signal Rate", signal_rate)
-        
-        # Display latest signal with custom price formatting
-        if signals:
-            latest = signals[-1]
-            st.info(
-                f"Latest Signal: {latest['action']} @ {format_price(latest['price'])}\n"
-                f"Time: {latest['timestamp']}\n"
-                f"Indicators: {latest['indicator']}"
-            )
+    col1, col2, col3 = st.columns(3)
+    
+    # Calculate metrics
+    if stats is None:
+        counts = signals_df['action'].value_counts()
+        stats = {'buy': int(counts.get('BUY', 0)), 'sell': int(counts.get('SELL', 0))}
+    buy_signals, sell_signals = stats['buy'], stats['sell']
+    # Signals per bar of input data
+    signal_rate = f"{len(signals_df) / max(len(data), 1) * 100:.1f}%"
+    
+    # Display metrics
+    with col1:
+        st.metric("Buy Signals", buy_signals)
+    with col2:
+        st.metric("Sell Signals", sell_signals)
+    with col3:
+        st.metric("Signal Rate", signal_rate)
+    
+    # Display latest signal with custom price formatting
+    last = signals_df.iloc[-1]
+    st.info(
+        f"Latest Signal: {last['action']} @ {format_price(last['price'])}\n"
+        f"Time: {last['timestamp']}\n"
+        f"Indicators: {last['indicator']}"
+    )
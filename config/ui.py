@@ -0,0 +1,33 @@
+# Chart timeframe selector: display label -> ccxt timeframe
+timeframe_options = {
+    "5 minutes": "5m",
+    "15 minutes": "15m",
+    "30 minutes": "30m",
+    "1 hour": "1h",
+    "2 hours": "2h",
+    "4 hours": "4h",
+    "6 hours": "6h",
+    "8 hours": "8h",
+    "12 hours": "12h",
+    "1 day": "1d",
+    "3 days": "3d",
+    "1 week": "1w",
+    "1 month": "1M"
+}
+
+# Length of one candle in seconds for each ccxt timeframe (a month counted as 30 days)
+timeframe_seconds = {
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "2h": 7200,
+    "4h": 14400,
+    "6h": 21600,
+    "8h": 28800,
+    "12h": 43200,
+    "1d": 86400,
+    "3d": 259200,
+    "1w": 604800,
+    "1M": 2592000
+}
@@ -1,19 +1,13 @@
 import streamlit as st
-import ccxt
 import pandas as pd
-from datetime import datetime, timedelta
-import time
+import importlib
+import math
 
+from config.ui import timeframe_options, timeframe_seconds
 from components.charts import create_price_chart
 from components.metrics import display_metrics
-from components.signals import display_signals, format_price
-from strategies.ma_crossover import MACrossoverStrategy
-from strategies.rsi_strategy import RSIStrategy
-from strategies.bollinger_bands import BollingerBandsStrategy
-from strategies.macd_strategy import MACDStrategy
-from strategies.combined_strategy import CombinedStrategy
-from utils.data_fetcher import get_historical_data
-from utils.backtester import Backtester
+from components.signals import display_signals, format_price, signal_stats, signals_frame
+from utils.data_fetcher import OHLCV_PAGE, data_fingerprint, get_historical_data
 
 st.set_page_config(
     page_title="Crypto Trading Dashboard",
@@ -22,18 +16,10 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-st.markdown("""
+# App, widget and text colors come from the [theme] section of .streamlit/config.toml;
+# only the metric card styling has no theme equivalent
+_CSS = """
     <style>
-    .stApp {
-        background-color: #0E1117;
-        color: #FAFAFA;
-    }
-    .stSelectbox, .stSlider {
-        background-color: #262730;
-    }
-    .stTab {
-        background-color: #1E1E1E;
-    }
     .stMetric {
         background-color: #262730;
         padding: 10px;
@@ -43,11 +29,11 @@ st.markdown("""
         font-size: 16px;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+st.markdown(_CSS, unsafe_allow_html=True)
 
 # Initialize session state
-if 'notifications' not in st.session_state:
-    st.session_state.notifications = []
 if 'active_strategy' not in st.session_state:
     st.session_state.active_strategy = None
 if 'data' not in st.session_state:
@@ -55,35 +41,220 @@ if 'data' not in st.session_state:
 if 'timeframe_value' not in st.session_state:
     st.session_state.timeframe_value = "5m"
 
-timeframe_options = {
-    "5 minutes": "5m",
-    "15 minutes": "15m",
-    "30 minutes": "30m",
-    "1 hour": "1h",
-    "2 hours": "2h",
-    "4 hours": "4h",
-    "6 hours": "6h",
-    "8 hours": "8h",
-    "12 hours": "12h",
-    "1 day": "1d",
-    "3 days": "3d",
-    "1 week": "1w",
-    "1 month": "1M"
+# Candles in the live chart download
+LIVE_CANDLES = 1000
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_market_data(exchange: str, symbol: str, timeframe: str) -> pd.DataFrame:
+    """
+    Live chart data; reruns from unrelated widget changes reuse the last download
+    """
+    return get_historical_data(exchange, symbol, timeframe, limit=LIVE_CANDLES)
+
+def backtest_candles(timeframe: str, backtest_days: int) -> int:
+    """
+    Just enough candles of this timeframe to cover the backtest period
+    """
+    return math.ceil(backtest_days * 86400 / timeframe_seconds[timeframe])
+
+@st.cache_data(ttl=900, max_entries=8, show_spinner=False)
+def fetch_backtest_data(exchange: str, symbol: str, timeframe: str, backtest_days: int) -> pd.DataFrame:
+    """
+    Backtest history, keyed on the period in days so the key only changes with the slider
+    """
+    return get_historical_data(exchange, symbol, timeframe, limit=backtest_candles(timeframe, backtest_days))
+
+def update_backtest_data(exchange: str, symbol: str, timeframe: str, backtest_days: int) -> pd.DataFrame:
+    """
+    Backtest history kept per session and extended with only the candles added since the last run
+    """
+    # Short periods fit inside the live download, so slice it rather than request the candles again
+    limit = backtest_candles(timeframe, backtest_days)
+    if limit <= LIVE_CANDLES:
+        return fetch_market_data(exchange, symbol, timeframe).iloc[-limit:]
+
+    key = (exchange, symbol, timeframe, backtest_days)
+    cache = st.session_state.setdefault('bt_cache', {})
+    cached = cache.get(key)
+    if cached is None or cached.empty:
+        data = fetch_backtest_data(exchange, symbol, timeframe, backtest_days)
+    else:
+        # Re-request from the last cached candle, which may still have been forming
+        since = int(cached.index[-1].value // 10**6)
+        new = get_historical_data(exchange, symbol, timeframe, limit=OHLCV_PAGE, since=since)
+        if len(new) >= OHLCV_PAGE:
+            # Too far behind for one page of candles; fall back to a full download
+            data = fetch_backtest_data(exchange, symbol, timeframe, backtest_days)
+        else:
+            data = pd.concat([cached[cached.index < new.index[0]] if not new.empty else cached, new])
+            data = data.iloc[-len(cached):]
+    cache[key] = data
+    return data
+
+# Strategy name -> (module, class); modules are imported on first use only
+strategy_paths = {
+    "MA Crossover": ("strategies.ma_crossover", "MACrossoverStrategy"),
+    "RSI": ("strategies.rsi_strategy", "RSIStrategy"),
+    "Bollinger Bands": ("strategies.bollinger_bands", "BollingerBandsStrategy"),
+    "MACD": ("strategies.macd_strategy", "MACDStrategy"),
+    "Combined Strategy": ("strategies.combined_strategy", "CombinedStrategy")
 }
 
-def initialize_strategy(strategy, strategy_params, strategies_list=None, combination_method=None):
-    if strategy == "MA Crossover":
-        return MACrossoverStrategy(**strategy_params)
-    elif strategy == "RSI":
-        return RSIStrategy(**strategy_params)
-    elif strategy == "Bollinger Bands":
-        return BollingerBandsStrategy(**strategy_params)
-    elif strategy == "MACD":
-        return MACDStrategy(**strategy_params)
-    elif strategy == "Combined Strategy" and strategies_list and len(strategies_list) >= 2:
-        return CombinedStrategy(strategies=strategies_list, combination_method=combination_method)
+def strategy_class(strategy: str):
+    """
+    Import and return the class behind a sidebar strategy name
+    """
+    module, name = strategy_paths[strategy]
+    return getattr(importlib.import_module(module), name)
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def initialize_strategy(strategy, params_tuple, strategies_tuple=(), combination_method=None):
+    """
+    Build the active strategy; unchanged sidebar settings reuse the cached instance.
+    Parameters arrive as sorted (name, value) tuples so they can key the cache.
+    """
+    if strategy == "Combined Strategy":
+        if len(strategies_tuple) >= 2:
+            strategies_list = [strategy_class(name)(**dict(params)) for name, params in strategies_tuple]
+            return strategy_class(strategy)(strategies=strategies_list, combination_method=combination_method)
+    elif strategy in strategy_paths:
+        return strategy_class(strategy)(**dict(params_tuple))
     return None
 
+@st.cache_data(max_entries=16, show_spinner=False)
+def compute_signals(data_hash, strategy_key, _strategy, _data) -> list:
+    """
+    Strategy signals, recomputed only when the data or the strategy settings change
+    """
+    return _strategy.generate_signals(_data)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def run_backtest(data_hash, strategy_key, initial_capital, _strategy, _data) -> tuple:
+    """
+    Backtest metrics and results chart for one data/strategy/capital combination
+    """
+    # Only loaded once a backtest is actually requested
+    from utils.backtester import Backtester
+    backtester = Backtester(_strategy, initial_capital)
+    # Shares the signal memo with the live tab, so a capital change or identical data skips regeneration
+    results = backtester.run(_data, compute_signals(data_hash, strategy_key, _strategy, _data))
+    return results, backtester.plot_results()
+
+@st.fragment
+def render_price_chart(data: pd.DataFrame, symbol: str):
+    """
+    Chart options and price chart; toggling an overlay reruns only this fragment
+    """
+    st.subheader(f"{symbol} Price Chart")
+    
+    opt_col1, opt_col2, opt_col3 = st.columns(3)
+    
+    with opt_col1:
+        timeframe = st.selectbox(
+            label='Time',
+            options=list(timeframe_options.keys()),
+            format_func=lambda x: x,
+            key='timeframe_selector',
+            label_visibility='collapsed'
+        )
+        # Data is fetched outside this fragment, so a new timeframe needs a full app rerun
+        if timeframe_options[timeframe] != st.session_state.timeframe_value:
+            st.session_state.timeframe_value = timeframe_options[timeframe]
+            st.rerun()
+        full_resolution = st.checkbox(
+            'Full resolution',
+            value=False,
+            help="Draw every candle instead of aggregating long histories to the chart width"
+        )
+
+    with opt_col2:
+        show_ma = st.checkbox('Show Moving Averages', value=False)
+        if show_ma:
+            ma_periods = st.multiselect(
+                'MA Periods',
+                options=[20, 50, 100, 200],
+                default=[50, 200]
+            )
+        else:
+            ma_periods = None
+
+    with opt_col3:
+        show_bb = st.checkbox('Show Bollinger Bands', value=False)
+        if show_bb:
+            bb_period = st.number_input('BB Period', min_value=5, max_value=50, value=20, step=1)
+            bb_std = st.number_input('BB Standard Deviation', min_value=1.0, max_value=4.0, value=2.0, step=0.1)
+        else:
+            bb_period = None
+            bb_std = None
+    
+    chart_params = {
+        'show_ma': show_ma,
+        'ma_periods': ma_periods if show_ma else None,
+        'show_bb': show_bb,
+        'bb_period': bb_period if show_bb else None,
+        'bb_std': bb_std if show_bb else None,
+        'full_resolution': full_resolution
+    }
+    
+    fig = create_price_chart(data, symbol, chart_params, st.session_state.timeframe_value)
+    st.plotly_chart(fig, use_container_width=True, config={
+        'scrollZoom': True,
+        'doubleClick': 'reset',
+        'displayModeBar': True,
+        'responsive': True,
+        'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape']
+    })
+
+@st.fragment
+def render_backtest(exchange, symbol, timeframe, backtest_days, initial_capital, strategy_key, active_strategy):
+    """
+    Backtest tab; the download and simulation only run when the user asks for them
+    """
+    st.subheader("Backtest Results")
+    backtest_key = (exchange, symbol, timeframe, backtest_days, initial_capital, strategy_key)
+
+    if st.button("Run Backtest"):
+        try:
+            backtest_data = update_backtest_data(exchange, symbol, timeframe, backtest_days)
+            if backtest_data is None or backtest_data.empty:
+                st.error("Failed to fetch backtest data")
+                return
+
+            results, backtest_chart = run_backtest(
+                data_fingerprint(backtest_data),
+                strategy_key,
+                initial_capital,
+                active_strategy,
+                backtest_data
+            )
+            st.session_state['last_backtest'] = (backtest_key, results, backtest_chart)
+        except Exception as e:
+            st.error(f"Error during backtesting: {str(e)}")
+            return
+
+    # Keep showing the last run until the settings it was made with change
+    last_backtest = st.session_state.get('last_backtest')
+    if last_backtest is None or last_backtest[0] != backtest_key:
+        st.info("Run the backtest to see results for the current settings")
+        return
+    _, results, backtest_chart = last_backtest
+
+    backtest_metrics = [
+        ("Total Return", f"{results['total_return']:.2f}%"),
+        ("Sharpe Ratio", f"{results['sharpe_ratio']:.2f}"),
+        ("Max Drawdown", f"{results['max_drawdown']:.2f}%"),
+        ("Win Rate", f"{results['win_rate']:.2f}%"),
+        ("Total Trades", results['total_trades'])
+    ]
+    with st.container():
+        for col, (label, value) in zip(st.columns(len(backtest_metrics)), backtest_metrics):
+            col.metric(label, value)
+
+    if backtest_chart:
+        st.plotly_chart(backtest_chart, use_container_width=True)
+    else:
+        st.warning("No backtest results to display")
+
 def main():
     st.sidebar.title("Configuration")
     exchange = st.sidebar.selectbox("Exchange", ["binance", "coinbase", "kraken"])
@@ -159,27 +330,27 @@ def main():
         if use_ma:
             ma_short = st.sidebar.slider("MA Short Window", min_value=5, max_value=50, value=20, step=1)
             ma_long = st.sidebar.slider("MA Long Window", min_value=20, max_value=200, value=50, step=5)
-            strategies_list.append(MACrossoverStrategy(short_window=ma_short, long_window=ma_long))
+            strategies_list.append(("MA Crossover", {'short_window': ma_short, 'long_window': ma_long}))
             
         use_rsi = st.sidebar.checkbox("Use RSI", value=True)
         if use_rsi:
             rsi_period = st.sidebar.slider("RSI Period", min_value=2, max_value=30, value=14, step=1)
             rsi_ob = st.sidebar.slider("RSI Overbought", min_value=50, max_value=90, value=70, step=1)
             rsi_os = st.sidebar.slider("RSI Oversold", min_value=10, max_value=50, value=30, step=1)
-            strategies_list.append(RSIStrategy(period=rsi_period, overbought=rsi_ob, oversold=rsi_os))
+            strategies_list.append(("RSI", {'period': rsi_period, 'overbought': rsi_ob, 'oversold': rsi_os}))
             
         use_bb = st.sidebar.checkbox("Use Bollinger Bands")
         if use_bb:
             bb_period = st.sidebar.slider("BB Period", min_value=5, max_value=50, value=20, step=1)
             bb_std = st.sidebar.slider("BB Std Dev", min_value=1.0, max_value=4.0, value=2.0, step=0.1)
-            strategies_list.append(BollingerBandsStrategy(period=bb_period, std_dev=bb_std, use_atr_exits=False))
+            strategies_list.append(("Bollinger Bands", {'period': bb_period, 'std_dev': bb_std, 'use_atr_exits': False}))
             
         use_macd = st.sidebar.checkbox("Use MACD")
         if use_macd:
             macd_fast = st.sidebar.slider("MACD Fast", min_value=5, max_value=50, value=12, step=1)
             macd_slow = st.sidebar.slider("MACD Slow", min_value=10, max_value=100, value=26, step=1)
             macd_signal = st.sidebar.slider("MACD Signal", min_value=5, max_value=30, value=9, step=1)
-            strategies_list.append(MACDStrategy(fast_period=macd_fast, slow_period=macd_slow, signal_period=macd_signal))
+            strategies_list.append(("MACD", {'fast_period': macd_fast, 'slow_period': macd_slow, 'signal_period': macd_signal}))
 
     st.sidebar.subheader("Backtesting")
     initial_capital = st.sidebar.number_input("Initial Capital (USDT)", min_value=100, value=10000, step=100)
@@ -188,136 +359,77 @@ def main():
     tab1, tab2 = st.tabs(["Live Trading", "Backtesting"])
 
     try:
-        active_strategy = initialize_strategy(strategy, strategy_params, strategies_list, combination_method)
+        strategy_key = (
+            strategy,
+            tuple(sorted(strategy_params.items())),
+            tuple((name, tuple(sorted(params.items()))) for name, params in strategies_list),
+            combination_method
+        )
+        active_strategy = initialize_strategy(*strategy_key)
         if active_strategy is None:
             st.warning("Please configure a valid strategy to continue")
             return
 
-        data = get_historical_data(exchange, symbol, st.session_state.timeframe_value)
+        # Pick up a timeframe change before fetching; the selector itself renders further down
+        if 'timeframe_selector' in st.session_state:
+            st.session_state.timeframe_value = timeframe_options[st.session_state.timeframe_selector]
+
+        data = fetch_market_data(exchange, symbol, st.session_state.timeframe_value)
         if data is None or data.empty:
             st.error("Failed to fetch market data")
             return
 
-        signals = active_strategy.generate_signals(data)
+        data_hash = data_fingerprint(data)
+        signals = compute_signals(data_hash, strategy_key, active_strategy, data)
+        stats = signal_stats(signals)
+        signals_df = signals_frame(data_hash, strategy_key, signals)
 
         with tab1:
             col1, col2 = st.columns([2, 1])
             
             with col1:
-                st.subheader(f"{symbol} Price Chart")
-                
-                opt_col1, opt_col2, opt_col3 = st.columns(3)
-                
-                with opt_col1:
-                    timeframe = st.selectbox(
-                        label='Time',
-                        options=list(timeframe_options.keys()),
-                        format_func=lambda x: x,
-                        key='timeframe_selector',
-                        label_visibility='collapsed'
-                    )
-                    st.session_state.timeframe_value = timeframe_options[timeframe]
-
-                with opt_col2:
-                    show_ma = st.checkbox('Show Moving Averages', value=False)
-                    if show_ma:
-                        ma_periods = st.multiselect(
-                            'MA Periods',
-                            options=[20, 50, 100, 200],
-                            default=[50, 200]
-                        )
-                    else:
-                        ma_periods = None
-
-                with opt_col3:
-                    show_bb = st.checkbox('Show Bollinger Bands', value=False)
-                    if show_bb:
-                        bb_period = st.number_input('BB Period', min_value=5, max_value=50, value=20, step=1)
-                        bb_std = st.number_input('BB Standard Deviation', min_value=1.0, max_value=4.0, value=2.0, step=0.1)
-                    else:
-                        bb_period = None
-                        bb_std = None
-                
-                chart_params = {
-                    'show_ma': show_ma,
-                    'ma_periods': ma_periods if show_ma else None,
-                    'show_bb': show_bb,
-                    'bb_period': bb_period if show_bb else None,
-                    'bb_std': bb_std if show_bb else None
-                }
-                
-                fig = create_price_chart(data, symbol, chart_params)
-                st.plotly_chart(fig, use_container_width=True, config={
-                    'scrollZoom': True,
-                    'doubleClick': 'reset',
-                    'displayModeBar': True,
-                    'responsive': True,
-                    'modeBarButtonsToAdd': ['drawline', 'drawopenpath', 'drawclosedpath', 'drawcircle', 'drawrect', 'eraseshape']
-                })
+                render_price_chart(data, symbol)
                 
                 try:
-                    display_signals(signals)
+                    display_signals(data, signals_df, stats)
                 except Exception as e:
                     st.error(f"Error displaying signals: {str(e)}")
 
             with col2:
                 try:
                     st.subheader("Performance Metrics")
-                    display_metrics(data, signals)
+                    display_metrics(data, signals, stats)
                 except Exception as e:
                     st.error(f"Error displaying metrics: {str(e)}")
                 
                 st.subheader("Recent Signals")
-                if signals:
-                    for signal in signals[-5:]:
-                        st.write(f"Signal: {signal['action']} at {format_price(signal['price'])}")
-                        st.write(f"Indicators: {signal['indicator']}")
+                if not signals_df.empty:
+                    # One static table for the last five signals; prices keep the magnitude-aware formatting
+                    recent = signals_df.tail(5)[['action', 'price', 'indicator']]
+                    st.table(recent.assign(price=recent['price'].map(format_price)).set_index('action'))
                 else:
                     st.info("No signals generated yet")
                     
                 st.subheader("Current Strategy Settings")
                 if strategy == "Combined Strategy":
                     st.write(f"Combination Method: {combination_method}")
-                    st.write(f"Active Strategies: {len(strategies_list)}")
-                    for s in strategies_list:
+                    st.write(f"Active Strategies: {len(active_strategy.strategies)}")
+                    for s in active_strategy.strategies:
                         st.write(f"- {s.name}")
                 else:
                     for param, value in strategy_params.items():
                         st.write(f"{param.replace('_', ' ').title()}: {value}")
         
         with tab2:
-            st.subheader("Backtest Results")
-            try:
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=backtest_days)
-                backtest_data = get_historical_data(
-                    exchange, 
-                    symbol, 
-                    st.session_state.timeframe_value, 
-                    limit=1440*backtest_days
-                )
-                
-                if backtest_data is not None and not backtest_data.empty:
-                    backtester = Backtester(active_strategy, initial_capital)
-                    results = backtester.run(backtest_data)
-                    
-                    col1, col2, col3, col4, col5 = st.columns(5)
-                    col1.metric("Total Return", f"{results['total_return']:.2f}%")
-                    col2.metric("Sharpe Ratio", f"{results['sharpe_ratio']:.2f}")
-                    col3.metric("Max Drawdown", f"{results['max_drawdown']:.2f}%")
-                    col4.metric("Win Rate", f"{results['win_rate']:.2f}%")
-                    col5.metric("Total Trades", results['total_trades'])
-                    
-                    backtest_chart = backtester.plot_results()
-                    if backtest_chart:
-                        st.plotly_chart(backtest_chart, use_container_width=True)
-                    else:
-                        st.warning("No backtest results to display")
-                else:
-                    st.error("Failed to fetch backtest data")
-                    
-            except Exception as e:
-                st.error(f"Error during backtesting: {str(e)}")
+            render_backtest(
+                exchange,
+                symbol,
+                st.session_state.timeframe_value,
+                backtest_days,
+                initial_capital,
+                strategy_key,
+                active_strategy
+            )
 
     except Exception as e:
         st.error(f"An unexpected error occurred: {str(e)}")
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from utils._njit import njit, warmup
+
+@njit(cache=True, nogil=True)
+def ma_cross_loop(close: np.ndarray, short_window: int, long_window: int) -> tuple:
+    """
+    Short and long simple moving averages kept as running sums, fused with the crossover scan.
+    Returns (bar positions, new state 1 above/-1 below/0 equal or unfilled, short MA, long MA) at each
+    state change; bar 0 always counts, matching diff() != 0 on the state column.
+    """
+    n = close.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    state = np.empty(n, dtype=np.int8)
+    short_out = np.empty(n)
+    long_out = np.empty(n)
+    k = 0
+    prev = 0
+    # Sums cover the finite closes in each window; a window holding any NaN has no average,
+    # as with rolling().mean(), and the sum recovers once the NaN has slid out
+    short_sum = 0.0
+    long_sum = 0.0
+    short_nans = 0
+    long_nans = 0
+    for i in range(n):
+        v = close[i]
+        if v == v:
+            short_sum += v
+            long_sum += v
+        else:
+            short_nans += 1
+            long_nans += 1
+        if i >= short_window:
+            old = close[i - short_window]
+            if old == old:
+                short_sum -= old
+            else:
+                short_nans -= 1
+        if i >= long_window:
+            old = close[i - long_window]
+            if old == old:
+                long_sum -= old
+            else:
+                long_nans -= 1
+        short_ma = short_sum / short_window if i >= short_window - 1 and short_nans == 0 else np.nan
+        long_ma = long_sum / long_window if i >= long_window - 1 and long_nans == 0 else np.nan
+        s = 0
+        if short_ma > long_ma:
+            s = 1
+        elif short_ma < long_ma:
+            s = -1
+        if i == 0 or s != prev:
+            idx[k] = i
+            state[k] = s
+            short_out[k] = short_ma
+            long_out[k] = long_ma
+            k += 1
+        prev = s
+    return idx[:k], state[:k], short_out[:k], long_out[:k]
+
+@njit(cache=True, nogil=True)
+def rsi_loop(rsi: np.ndarray, oversold: float, overbought: float) -> tuple:
+    """
+    Bars where the RSI zone state (1 oversold, -1 overbought, 0 between/NaN) changes.
+    Returns (bar positions, new state); bar 0 always counts, matching diff() != 0 on the state column.
+    """
+    n = rsi.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    state = np.empty(n, dtype=np.int8)
+    k = 0
+    prev = 0
+    for i in range(n):
+        s = 0
+        if rsi[i] > overbought:
+            s = -1
+        elif rsi[i] < oversold:
+            s = 1
+        if i == 0 or s != prev:
+            idx[k] = i
+            state[k] = s
+            k += 1
+        prev = s
+    return idx[:k], state[:k]
+
+@njit(cache=True, nogil=True)
+def bb_state_loop(close: np.ndarray, upper: np.ndarray, lower: np.ndarray, atr: np.ndarray,
+                  atr_multiplier: float, use_atr: bool) -> tuple:
+    """
+    Long-only Bollinger state machine: enter below the lower band, exit above the upper band
+    or, with ATR exits, below the stop set at entry. Bars without both bands are skipped.
+    Returns (bar positions, action 1 buy/-1 sell, reason 0 entry/1 upper band/2 stop loss).
+    """
+    n = close.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    action = np.empty(n, dtype=np.int8)
+    reason = np.empty(n, dtype=np.int8)
+    k = 0
+    position_open = False
+    stop_loss = np.nan
+    for i in range(n):
+        if np.isnan(upper[i]) or np.isnan(lower[i]):
+            continue
+        price = close[i]
+        if not position_open:
+            if price < lower[i]:
+                if use_atr:
+                    stop_loss = price - atr[i] * atr_multiplier
+                idx[k] = i
+                action[k] = 1
+                reason[k] = 0
+                k += 1
+                position_open = True
+        else:
+            exit_reason = 0
+            if price > upper[i]:
+                exit_reason = 1
+            elif use_atr and price < stop_loss:
+                exit_reason = 2
+            if exit_reason != 0:
+                idx[k] = i
+                action[k] = -1
+                reason[k] = exit_reason
+                k += 1
+                position_open = False
+                stop_loss = np.nan
+    return idx[:k], action[:k], reason[:k]
+
+@njit(cache=True, nogil=True)
+def macd_loop(macd: np.ndarray, signal: np.ndarray, hist: np.ndarray, threshold: float) -> tuple:
+    """
+    Long-only MACD state machine: enter when the histogram rises through -threshold with MACD above
+    its signal line, exit when it falls through +threshold with MACD below. NaN bars never act.
+    Returns (bar positions, action 1 buy/-1 sell).
+    """
+    n = macd.shape[0]
+    idx = np.empty(n, dtype=np.int64)
+    action = np.empty(n, dtype=np.int8)
+    k = 0
+    position_open = False
+    for i in range(1, n):
+        if not position_open:
+            if hist[i - 1] < -threshold and hist[i] >= -threshold and macd[i] > signal[i]:
+                idx[k] = i
+                action[k] = 1
+                k += 1
+                position_open = True
+        elif hist[i - 1] > threshold and hist[i] <= threshold and macd[i] < signal[i]:
+            idx[k] = i
+            action[k] = -1
+            k += 1
+            position_open = False
+    return idx[:k], action[:k]
+
+# Strategy inputs: close and indicator columns from pandas
+_x = pd.Series(np.linspace(1.0, 2.0, 32)).to_numpy(dtype=np.float64)
+warmup(ma_cross_loop, _x, 5, 10)
+warmup(rsi_loop, _x, 30.0, 70.0)
+warmup(macd_loop, _x, _x, _x, 0.0)
+# Bollinger bands arrive as fresh arrays, the ATR as a pandas column or zeros
+_bands = _x * 1.0
+warmup(bb_state_loop, _x, _bands, _bands, _x, 2.0, True)
+warmup(bb_state_loop, _x, _bands, _bands, np.zeros(32), 2.0, False)
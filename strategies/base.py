@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 import pandas as pd
+import numpy as np
 
 class BaseStrategy(ABC):
     def __init__(self):
@@ -10,5 +11,27 @@ class BaseStrategy(ABC):
         pass
     
     @abstractmethod
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        """Metrics for data; pass signals already generated for it to skip generating them again"""
         pass
+
+def signal_metrics(signals: list) -> dict:
+    """
+    Round-trip returns of a signal list: a SELL closes the position opened by the BUY just before it.
+    The final signal never closes a trade.
+    """
+    if not signals:
+        return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
+    
+    # Sequentially, a SELL only closes a trade when the previous signal was a (non-zero) BUY
+    action = np.array([s['action'] for s in signals[:-1]])
+    price = np.array([s['price'] for s in signals[:-1]], dtype=np.float64)
+    exits = np.flatnonzero((action[1:] == 'SELL') & (action[:-1] == 'BUY') & (price[:-1] != 0)) + 1
+    entries = price[exits - 1]
+    returns = (price[exits] - entries) / entries * 100
+    
+    return {
+        'total_returns': float(returns.sum()),
+        'win_rate': float((returns > 0).mean()) if returns.size else 0,
+        'avg_return': float(returns.mean()) if returns.size else 0
+    }
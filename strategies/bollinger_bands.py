@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy
+from .base import BaseStrategy, signal_metrics
+from ._kernels import bb_state_loop
+from utils.indicators import rolling_mean_std
 
 class BollingerBandsStrategy(BaseStrategy):
     def __init__(self, period=20, std_dev=2.0, use_atr_exits=True, atr_period=14, atr_multiplier=2.0):
@@ -22,90 +24,51 @@ class BollingerBandsStrategy(BaseStrategy):
             raise ValueError("Multipliers must be positive")
     
     def calculate_atr(self, data: pd.DataFrame) -> pd.Series:
-        high_low = data['high'] - data['low']
-        high_close = np.abs(data['high'] - data['close'].shift())
-        low_close = np.abs(data['low'] - data['close'].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        return true_range.rolling(window=self.atr_period).mean()
+        high = data['high'].to_numpy(dtype=np.float64)
+        low = data['low'].to_numpy(dtype=np.float64)
+        close = data['close'].to_numpy(dtype=np.float64)
+        
+        # Previous close, shifted once and shared by both gap terms
+        prev_close = np.empty_like(close)
+        prev_close[:1] = np.nan
+        prev_close[1:] = close[:-1]
+        
+        # fmax skips the NaN gap terms on the first bar, as the row-wise max(axis=1) did
+        true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        return pd.Series(true_range, index=data.index).rolling(window=self.atr_period).mean()
     
     def generate_signals(self, data: pd.DataFrame) -> list:
-        df = data.copy()
+        close = data['close'].to_numpy(dtype=np.float64)
         
         # Calculate Bollinger Bands
-        df['SMA'] = df['close'].rolling(window=self.period).mean()
-        df['STD'] = df['close'].rolling(window=self.period).std()
-        df['Upper'] = df['SMA'] + (df['STD'] * self.std_dev)
-        df['Lower'] = df['SMA'] - (df['STD'] * self.std_dev)
+        # One O(N) pass for both mean and sample std instead of two pandas rolling reductions
+        sma, std = rolling_mean_std(close, self.period)
+        upper = sma + (std * self.std_dev)
+        lower = sma - (std * self.std_dev)
         
         # Calculate ATR for dynamic exits if enabled
-        if self.use_atr_exits:
-            df['ATR'] = self.calculate_atr(df)
-        
-        # Generate signals
-        signals = []
-        position_open = False
-        stop_loss = None
+        atr = self.calculate_atr(data).to_numpy(dtype=np.float64) if self.use_atr_exits else np.zeros(len(data))
         
-        for i in range(len(df)):
-            if pd.isna(df['Upper'].iloc[i]) or pd.isna(df['Lower'].iloc[i]):
-                continue
-                
-            current_price = df['close'].iloc[i]
-            current_time = df.index[i]
-            
-            if not position_open:
-                # Entry conditions
-                if current_price < df['Lower'].iloc[i]:
-                    stop_loss = current_price - (df['ATR'].iloc[i] * self.atr_multiplier) if self.use_atr_exits else None
-                    signals.append({
-                        'timestamp': current_time,
-                        'price': current_price,
-                        'action': 'BUY',
-                        'indicator': f"BB Lower: {df['Lower'].iloc[i]:.2f}, ATR: {df['ATR'].iloc[i]:.2f}" if self.use_atr_exits else f"BB Lower: {df['Lower'].iloc[i]:.2f}"
-                    })
-                    position_open = True
-            else:
-                # Exit conditions
-                exit_signal = False
-                exit_reason = ""
-                
-                if current_price > df['Upper'].iloc[i]:
-                    exit_signal = True
-                    exit_reason = "Upper Band"
-                elif self.use_atr_exits and stop_loss is not None and current_price < stop_loss:
-                    exit_signal = True
-                    exit_reason = "Stop Loss"
-                
-                if exit_signal:
-                    signals.append({
-                        'timestamp': current_time,
-                        'price': current_price,
-                        'action': 'SELL',
-                        'indicator': f"Exit - {exit_reason}"
-                    })
-                    position_open = False
-                    stop_loss = None
+        # Entries and exits from one compiled pass; the stop carries from each entry bar
+        idx, action, reason = bb_state_loop(
+            close, upper, lower, atr, float(self.atr_multiplier), bool(self.use_atr_exits)
+        )
         
-        return signals
+        exit_reasons = {1: "Upper Band", 2: "Stop Loss"}
+        return [
+            {
+                'timestamp': timestamp,
+                'price': price,
+                'action': 'BUY',
+                'indicator': f"BB Lower: {lower[i]:.2f}, ATR: {atr[i]:.2f}" if self.use_atr_exits else f"BB Lower: {lower[i]:.2f}"
+            } if a == 1 else {
+                'timestamp': timestamp,
+                'price': price,
+                'action': 'SELL',
+                'indicator': f"Exit - {exit_reasons[r]}"
+            }
+            for i, timestamp, price, a, r in zip(idx, data.index[idx], close[idx], action, reason)
+        ]
     
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
-        signals = self.generate_signals(data)
-        if not signals:
-            return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
-        
-        returns = []
-        position = None
-        
-        for i in range(len(signals)-1):
-            if signals[i]['action'] == 'BUY':
-                position = signals[i]['price']
-            elif signals[i]['action'] == 'SELL' and position:
-                returns.append((signals[i]['price'] - position) / position * 100)
-                position = None
-        
-        return {
-            'total_returns': sum(returns),
-            'win_rate': len([r for r in returns if r > 0]) / len(returns) if returns else 0,
-            'avg_return': np.mean(returns) if returns else 0
-        }
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        return signal_metrics(self.generate_signals(data) if signals is None else signals)
@@ -1,7 +1,9 @@
 import pandas as pd
-import numpy as np
-from typing import List, Dict
-from .base import BaseStrategy
+from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from heapq import merge
+from itertools import groupby
+from .base import BaseStrategy, signal_metrics
 
 class CombinedStrategy(BaseStrategy):
     def __init__(self, strategies: List[BaseStrategy], combination_method: str = 'AND'):
@@ -25,26 +27,25 @@ class CombinedStrategy(BaseStrategy):
             raise ValueError("Combination method must be 'AND' or 'OR'")
     
     def generate_signals(self, data: pd.DataFrame) -> list:
-        # Get signals from all strategies
-        strategy_signals = []
-        for strategy in self.strategies:
-            signals = strategy.generate_signals(data)
-            strategy_signals.append({signal['timestamp']: signal for signal in signals})
+        # Get signals from all strategies; they only read data, so they can run side by side
+        with ThreadPoolExecutor(max_workers=len(self.strategies)) as executor:
+            all_signals = list(executor.map(lambda strategy: strategy.generate_signals(data), self.strategies))
         
         combined_signals = []
-        all_timestamps = sorted(set().union(*(s.keys() for s in strategy_signals)))
+        # Each list is already in time order, so one k-way merge visits the signals chronologically;
+        # merge is stable, so equal timestamps arrive in strategy order
+        merged = merge(
+            *([(signal['timestamp'], i, signal) for signal in signals] for i, signals in enumerate(all_signals)),
+            key=lambda item: item[0]
+        )
         
-        for timestamp in all_timestamps:
-            signals_at_timestamp = []
+        for timestamp, group in groupby(merged, key=lambda item: item[0]):
+            # One signal per strategy at this timestamp (the last, should a strategy repeat one)
+            by_strategy = {}
+            for _, i, signal in group:
+                by_strategy[i] = signal
+            signals_at_timestamp = list(by_strategy.values())
             
-            # Check signals from each strategy at this timestamp
-            for strat_signals in strategy_signals:
-                if timestamp in strat_signals:
-                    signals_at_timestamp.append(strat_signals[timestamp])
-            
-            if not signals_at_timestamp:
-                continue
-                
             # Apply combination logic
             if self.combination_method == 'AND':
                 # All strategies must agree on the action
@@ -62,23 +63,5 @@ class CombinedStrategy(BaseStrategy):
         
         return combined_signals
     
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
-        signals = self.generate_signals(data)
-        if not signals:
-            return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
-        
-        returns = []
-        position = None
-        
-        for i in range(len(signals)-1):
-            if signals[i]['action'] == 'BUY':
-                position = signals[i]['price']
-            elif signals[i]['action'] == 'SELL' and position:
-                returns.append((signals[i]['price'] - position) / position * 100)
-                position = None
-        
-        return {
-            'total_returns': sum(returns),
-            'win_rate': len([r for r in returns if r > 0]) / len(returns) if returns else 0,
-            'avg_return': np.mean(returns) if returns else 0
-        }
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        return signal_metrics(self.generate_signals(data) if signals is None else signals)
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy
+from .base import BaseStrategy, signal_metrics
+from ._kernels import ma_cross_loop
 
 class MACrossoverStrategy(BaseStrategy):
     def __init__(self, short_window=20, long_window=50):
@@ -19,48 +20,22 @@ class MACrossoverStrategy(BaseStrategy):
             raise ValueError("Short window must be smaller than long window")
     
     def generate_signals(self, data: pd.DataFrame) -> list:
-        df = data.copy()
+        close = data['close'].to_numpy(dtype=np.float64)
         
-        # Calculate moving averages
-        df['SMA_short'] = df['close'].rolling(window=self.short_window).mean()
-        df['SMA_long'] = df['close'].rolling(window=self.long_window).mean()
+        # Both moving averages and the bars where the crossover state changes, in one compiled pass
+        idx, state, sma_short, sma_long = ma_cross_loop(close, self.short_window, self.long_window)
         
-        # Generate signals
-        df['signal'] = 0
-        df.loc[df['SMA_short'] > df['SMA_long'], 'signal'] = 1
-        df.loc[df['SMA_short'] < df['SMA_long'], 'signal'] = -1
-        
-        # Get signal changes
-        signals = []
-        df['signal_change'] = df['signal'].diff()
-        
-        for idx, row in df[df['signal_change'] != 0].iterrows():
-            signals.append({
-                'timestamp': idx,
-                'price': row['close'],
-                'action': 'BUY' if row['signal'] == 1 else 'SELL',
-                'indicator': f"Short MA: {row['SMA_short']:.2f}, Long MA: {row['SMA_long']:.2f}"
-            })
-            
-        return signals
+        return [
+            {
+                'timestamp': timestamp,
+                'price': price,
+                'action': 'BUY' if s == 1 else 'SELL',
+                'indicator': f"Short MA: {short_ma:.2f}, Long MA: {long_ma:.2f}"
+            }
+            for timestamp, price, s, short_ma, long_ma in zip(
+                data.index[idx], close[idx], state, sma_short, sma_long
+            )
+        ]
     
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
-        signals = self.generate_signals(data)
-        if not signals:
-            return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
-        
-        returns = []
-        position = None
-        
-        for i in range(len(signals)-1):
-            if signals[i]['action'] == 'BUY':
-                position = signals[i]['price']
-            elif signals[i]['action'] == 'SELL' and position:
-                returns.append((signals[i]['price'] - position) / position * 100)
-                position = None
-        
-        return {
-            'total_returns': sum(returns),
-            'win_rate': len([r for r in returns if r > 0]) / len(returns) if returns else 0,
-            'avg_return': np.mean(returns) if returns else 0
-        }
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        return signal_metrics(self.generate_signals(data) if signals is None else signals)
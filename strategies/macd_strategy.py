@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy
+from .base import BaseStrategy, signal_metrics
+from ._kernels import macd_loop
+from utils.indicators import ema
 
 class MACDStrategy(BaseStrategy):
     def __init__(self, fast_period=12, slow_period=26, signal_period=9, histogram_threshold=0):
@@ -23,86 +25,45 @@ class MACDStrategy(BaseStrategy):
             raise ValueError("Histogram threshold must be a number")
     
     def calculate_macd(self, data: pd.DataFrame) -> tuple:
-        # Calculate exponential moving averages
-        ema_fast = data['close'].ewm(span=self.fast_period, adjust=False).mean()
-        ema_slow = data['close'].ewm(span=self.slow_period, adjust=False).mean()
+        close = data['close'].to_numpy(dtype=np.float64)
+        
+        # Calculate exponential moving averages (compiled ewm(adjust=False) recurrence)
+        ema_fast = ema(close, self.fast_period)
+        ema_slow = ema(close, self.slow_period)
         
         # Calculate MACD line and signal line
         macd_line = ema_fast - ema_slow
-        signal_line = macd_line.ewm(span=self.signal_period, adjust=False).mean()
+        signal_line = ema(macd_line, self.signal_period)
         
         # Calculate MACD histogram
         histogram = macd_line - signal_line
         
-        return macd_line, signal_line, histogram
+        return (
+            pd.Series(macd_line, index=data.index),
+            pd.Series(signal_line, index=data.index),
+            pd.Series(histogram, index=data.index)
+        )
     
     def generate_signals(self, data: pd.DataFrame) -> list:
-        df = data.copy()
-        
         # Calculate MACD components
-        macd_line, signal_line, histogram = self.calculate_macd(df)
-        df['MACD'] = macd_line
-        df['Signal'] = signal_line
-        df['Histogram'] = histogram
-        
-        signals = []
-        position_open = False
+        macd_line, signal_line, histogram = self.calculate_macd(data)
+        macd = macd_line.to_numpy(dtype=np.float64)
+        signal = signal_line.to_numpy(dtype=np.float64)
+        hist = histogram.to_numpy(dtype=np.float64)
+        close = data['close'].to_numpy(dtype=np.float64)
         
-        for i in range(1, len(df)):
-            if pd.isna(df['MACD'].iloc[i]) or pd.isna(df['Signal'].iloc[i]):
-                continue
-                
-            current_price = df['close'].iloc[i]
-            current_time = df.index[i]
-            prev_hist = df['Histogram'].iloc[i-1]
-            curr_hist = df['Histogram'].iloc[i]
-            
-            # Entry conditions
-            if not position_open:
-                # Bullish crossing with histogram threshold
-                if (prev_hist < -self.histogram_threshold and 
-                    curr_hist >= -self.histogram_threshold and 
-                    df['MACD'].iloc[i] > df['Signal'].iloc[i]):
-                    signals.append({
-                        'timestamp': current_time,
-                        'price': current_price,
-                        'action': 'BUY',
-                        'indicator': f"MACD: {df['MACD'].iloc[i]:.2f}, Signal: {df['Signal'].iloc[i]:.2f}, Hist: {curr_hist:.2f}"
-                    })
-                    position_open = True
-            else:
-                # Exit conditions
-                # Bearish crossing with histogram threshold
-                if (prev_hist > self.histogram_threshold and 
-                    curr_hist <= self.histogram_threshold and 
-                    df['MACD'].iloc[i] < df['Signal'].iloc[i]):
-                    signals.append({
-                        'timestamp': current_time,
-                        'price': current_price,
-                        'action': 'SELL',
-                        'indicator': f"MACD: {df['MACD'].iloc[i]:.2f}, Signal: {df['Signal'].iloc[i]:.2f}, Hist: {curr_hist:.2f}"
-                    })
-                    position_open = False
+        # Threshold crossings and entry/exit alternation in one compiled pass
+        idx, action = macd_loop(macd, signal, hist, float(self.histogram_threshold))
         
-        return signals
+        return [
+            {
+                'timestamp': timestamp,
+                'price': close[i],
+                'action': 'BUY' if a == 1 else 'SELL',
+                'indicator': f"MACD: {macd[i]:.2f}, Signal: {signal[i]:.2f}, Hist: {hist[i]:.2f}"
+            }
+            for i, timestamp, a in zip(idx, data.index[idx], action)
+        ]
     
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
-        signals = self.generate_signals(data)
-        if not signals:
-            return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
-        
-        returns = []
-        position = None
-        
-        for i in range(len(signals)-1):
-            if signals[i]['action'] == 'BUY':
-                position = signals[i]['price']
-            elif signals[i]['action'] == 'SELL' and position:
-                returns.append((signals[i]['price'] - position) / position * 100)
-                position = None
-        
-        return {
-            'total_returns': sum(returns),
-            'win_rate': len([r for r in returns if r > 0]) / len(returns) if returns else 0,
-            'avg_return': np.mean(returns) if returns else 0
-        }
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        return signal_metrics(self.generate_signals(data) if signals is None else signals)
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy
+from .base import BaseStrategy, signal_metrics
+from ._kernels import rsi_loop
+from utils.indicators import wilder_rsi
 
 class RSIStrategy(BaseStrategy):
     def __init__(self, period=14, overbought=70, oversold=30):
@@ -20,51 +22,25 @@ class RSIStrategy(BaseStrategy):
             raise ValueError("Oversold must be less than overbought and both must be between 0 and 100")
     
     def calculate_rsi(self, data: pd.DataFrame) -> pd.Series:
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        # Wilder's smoothing: one recursive O(N) pass instead of two rolling windows
+        rsi = wilder_rsi(data['close'].to_numpy(dtype=np.float64), self.period)
+        return pd.Series(rsi, index=data.index)
     
     def generate_signals(self, data: pd.DataFrame) -> list:
-        df = data.copy()
-        df['RSI'] = self.calculate_rsi(df)
+        rsi = self.calculate_rsi(data).to_numpy(dtype=np.float64)
         
-        # Generate signals
-        df['signal'] = 0
-        df.loc[df['RSI'] < self.oversold, 'signal'] = 1
-        df.loc[df['RSI'] > self.overbought, 'signal'] = -1
+        # Bars where the RSI zone changes, found in one compiled pass
+        idx, state = rsi_loop(rsi, float(self.oversold), float(self.overbought))
         
-        signals = []
-        df['signal_change'] = df['signal'].diff()
-        
-        for idx, row in df[df['signal_change'] != 0].iterrows():
-            signals.append({
-                'timestamp': idx,
-                'price': row['close'],
-                'action': 'BUY' if row['signal'] == 1 else 'SELL',
-                'indicator': f"RSI: {row['RSI']:.2f}"
-            })
-            
-        return signals
+        return [
+            {
+                'timestamp': timestamp,
+                'price': price,
+                'action': 'BUY' if s == 1 else 'SELL',
+                'indicator': f"RSI: {value:.2f}"
+            }
+            for timestamp, price, s, value in zip(data.index[idx], data['close'].to_numpy()[idx], state, rsi[idx])
+        ]
     
-    def calculate_metrics(self, data: pd.DataFrame) -> dict:
-        signals = self.generate_signals(data)
-        if not signals:
-            return {'total_returns': 0, 'win_rate': 0, 'avg_return': 0}
-        
-        returns = []
-        position = None
-        
-        for i in range(len(signals)-1):
-            if signals[i]['action'] == 'BUY':
-                position = signals[i]['price']
-            elif signals[i]['action'] == 'SELL' and position:
-                returns.append((signals[i]['price'] - position) / position * 100)
-                position = None
-        
-        return {
-            'total_returns': sum(returns),
-            'win_rate': len([r for r in returns if r > 0]) / len(returns) if returns else 0,
-            'avg_return': np.mean(returns) if returns else 0
-        }
+    def calculate_metrics(self, data: pd.DataFrame, signals: list = None) -> dict:
+        return signal_metrics(self.generate_signals(data) if signals is None else signals)
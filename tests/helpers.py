@@ -0,0 +1,8 @@
+import numpy as np
+
+
+def close_with_gap(n=400, gap=(150, 153), seed=0):
+    """Random-walk closes with NaNs over the bars in [gap[0], gap[1])"""
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+    close[gap[0]:gap[1]] = np.nan
+    return close
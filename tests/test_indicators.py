@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from helpers import close_with_gap
+from utils.indicators import ema, multi_sma, rolling_mean_std, wilder_rsi
+
+
+class MultiSMATest(unittest.TestCase):
+    def test_matches_pandas_rolling_with_nan_close(self):
+        x = close_with_gap()
+        periods = np.array([5, 20, 50], dtype=np.int64)
+
+        out = multi_sma(x, periods)
+
+        for j, p in enumerate(periods):
+            expected = pd.Series(x).rolling(window=int(p)).mean().to_numpy()
+            np.testing.assert_array_equal(np.isnan(out[:, j]), np.isnan(expected))
+            np.testing.assert_allclose(out[:, j], expected, rtol=1e-9)
+
+
+class RollingMeanStdTest(unittest.TestCase):
+    def test_matches_pandas_rolling_with_nan_close(self):
+        x = close_with_gap()
+
+        mean, std = rolling_mean_std(x, 20)
+
+        rolling = pd.Series(x).rolling(window=20)
+        expected_mean = rolling.mean().to_numpy()
+        expected_std = rolling.std().to_numpy()
+        np.testing.assert_array_equal(np.isnan(mean), np.isnan(expected_mean))
+        np.testing.assert_array_equal(np.isnan(std), np.isnan(expected_std))
+        np.testing.assert_allclose(mean, expected_mean, rtol=1e-9)
+        np.testing.assert_allclose(std, expected_std, rtol=1e-6)
+
+
+class WilderRSITest(unittest.TestCase):
+    def test_reseeds_after_nan_close(self):
+        close = close_with_gap()
+
+        rsi = wilder_rsi(close, 14)
+
+        # Before the gap nothing changes; the bars up to 14 changes past it are blank; after that
+        # the averages restart from the first close after the gap
+        np.testing.assert_array_equal(rsi[:150], wilder_rsi(close[:150], 14))
+        self.assertTrue(np.isnan(rsi[150:153 + 14]).all())
+        np.testing.assert_array_equal(rsi[153:], wilder_rsi(close[153:], 14))
+        self.assertTrue(np.isfinite(rsi[153 + 14:]).all())
+
+
+class EMATest(unittest.TestCase):
+    def test_matches_pandas_ewm_adjust_false(self):
+        for x in (close_with_gap(gap=(0, 0)), close_with_gap(), close_with_gap(gap=(0, 3))):
+            for span in (9, 12, 26):
+                expected = pd.Series(x).ewm(span=span, adjust=False).mean().to_numpy()
+                np.testing.assert_array_equal(ema(x, span), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from helpers import close_with_gap
+from strategies._kernels import ma_cross_loop
+
+
+class MACrossLoopTest(unittest.TestCase):
+    def test_matches_pandas_rolling_with_nan_close(self):
+        close = close_with_gap()
+        short_ma = pd.Series(close).rolling(window=5).mean().to_numpy()
+        long_ma = pd.Series(close).rolling(window=20).mean().to_numpy()
+        state = np.where(short_ma > long_ma, 1, np.where(short_ma < long_ma, -1, 0))
+        expected = np.flatnonzero(np.diff(state, prepend=state[0] - 1) != 0)
+
+        idx, got_state, got_short, got_long = ma_cross_loop(close, 5, 20)
+
+        np.testing.assert_array_equal(idx, expected)
+        np.testing.assert_array_equal(got_state, state[expected])
+        np.testing.assert_allclose(got_short, short_ma[expected], rtol=1e-9)
+        np.testing.assert_allclose(got_long, long_ma[expected], rtol=1e-9)
+        # Crossovers keep being reported once the gap has left the long window
+        self.assertTrue((idx > 153 + 20).any())
+
+
+if __name__ == '__main__':
+    unittest.main()
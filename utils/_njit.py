@@ -0,0 +1,29 @@
+"""
+Optional Numba support: kernels decorated with njit run as plain Python when numba is not installed
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+def warmup(fn, *args):
+    """
+    Call a kernel once with sample arguments so numba compiles it for those types now (or loads it
+    from the on-disk cache) instead of on first real use. numba compiles per argument type, array
+    flags included, so samples should be built like the real inputs: columns taken through pandas
+    are read-only under copy-on-write. A no-op without numba; errors are ignored, since the kernel
+    still compiles on first use.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    try:
+        fn(*args)
+    except Exception:
+        pass
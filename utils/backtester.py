@@ -1,73 +1,149 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from typing import TYPE_CHECKING
+
+from utils._njit import njit, warmup
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _equity_stats(value: np.ndarray, risk_free: float) -> tuple:
+    """
+    One pass over an equity curve: mean and sample std (Welford) of the per-bar excess returns,
+    and the largest fall from the running peak as a fraction of it. NaN bars are skipped,
+    as pandas' pct_change/mean/std/cummax/max do. Returns (mean, std, max drawdown).
+    """
+    n = value.shape[0]
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    peak = np.nan
+    max_drawdown = np.nan
+    for i in range(n):
+        v = value[i]
+        if v == v:
+            if not peak >= v:
+                peak = v
+            drawdown = (peak - v) / peak
+            if drawdown == drawdown and not max_drawdown >= drawdown:
+                max_drawdown = drawdown
+        if i > 0:
+            excess = v / value[i - 1] - 1.0 - risk_free
+            if excess == excess:
+                count += 1
+                delta = excess - mean
+                mean += delta / count
+                m2 += delta * (excess - mean)
+    if count == 0:
+        mean = np.nan
+    std = np.sqrt(m2 / (count - 1)) if count > 1 else np.nan
+    return mean, std, max_drawdown
+
+@njit(cache=True, nogil=True, error_model='numpy')
+def _simulate(close: np.ndarray, bars: np.ndarray, actions: np.ndarray, capital: float) -> tuple:
+    """
+    Long-only entry/exit state machine over the signal events (bar position and action,
+    1 = BUY, -1 = SELL, in visiting order). Returns the portfolio value per bar and, per trade,
+    its bar, price, portfolio value, size and pnl (NaN on entries); trades alternate entry/exit.
+    """
+    n = close.shape[0]
+    values = np.empty(n, dtype=np.float64)
+    trade_bars = np.empty(bars.shape[0], dtype=np.int64)
+    trade_prices = np.empty(bars.shape[0], dtype=np.float64)
+    trade_values = np.empty(bars.shape[0], dtype=np.float64)
+    trade_sizes = np.empty(bars.shape[0], dtype=np.float64)
+    trade_pnls = np.empty(bars.shape[0], dtype=np.float64)
+    k = 0
+    position = 0.0
+    entry_price = 0.0
+    filled = 0
+    for j in range(bars.shape[0]):
+        i = bars[j]
+        price = close[i]
+        # Bars since the last signal bar keep the state it left
+        for b in range(filled, i):
+            values[b] = capital if position == 0 else position * close[b]
+        if i > filled:
+            filled = i
+        if actions[j] == 1 and position == 0:
+            position = capital / price
+            entry_price = price
+            trade_pnls[k] = np.nan
+        elif actions[j] == -1 and position > 0:
+            capital = position * price
+            trade_pnls[k] = (price - entry_price) * position
+        else:
+            continue
+        trade_bars[k] = i
+        trade_prices[k] = price
+        trade_values[k] = position * price
+        trade_sizes[k] = position
+        k += 1
+        if actions[j] == -1:
+            position = 0.0
+    # Portfolio value from the last signal bar to the end
+    for b in range(filled, n):
+        values[b] = capital if position == 0 else position * close[b]
+    return values, trade_bars[:k], trade_prices[:k], trade_values[:k], trade_sizes[:k], trade_pnls[:k]
+
+# Most points drawn per equity/drawdown curve
+PLOT_POINTS = 2000
 
 class Backtester:
     def __init__(self, strategy, initial_capital=10000):
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.positions = []
-        self.portfolio_value = []
+        # Portfolio value per bar, indexed by bar timestamp
+        self.portfolio_value = pd.Series(dtype=np.float64)
         self.trades = []
+        # Pnl of every closed trade, in the order of self.trades' exits
+        self.trade_pnls = np.empty(0, dtype=np.float64)
     
-    def run(self, data: pd.DataFrame) -> dict:
-        """Run backtest on historical data"""
-        signals = self.strategy.generate_signals(data)
+    def run(self, data: pd.DataFrame, signals: list = None) -> dict:
+        """Run backtest on historical data; pass signals already generated for this data to skip regenerating them"""
+        if signals is None:
+            signals = self.strategy.generate_signals(data)
         
-        # Initialize tracking variables
-        capital = self.initial_capital
-        position = 0
-        entry_price = 0
+        index = data.index
+        close = data['close'].to_numpy(dtype=np.float64)
         
-        # Track portfolio value and trades
-        for i in range(len(data)):
-            current_price = data['close'].iloc[i]
-            current_time = data.index[i]
-            
-            # Check for signals at current timestamp
-            current_signals = [s for s in signals if s['timestamp'] == current_time]
-            
-            for signal in current_signals:
-                if signal['action'] == 'BUY' and position == 0:
-                    # Enter long position
-                    position = capital / current_price
-                    entry_price = current_price
-                    portfolio_value = position * current_price
-                    self.trades.append({
-                        'type': 'ENTRY',
-                        'time': current_time,
-                        'price': current_price,
-                        'portfolio_value': portfolio_value,
-                        'size': position
-                    })
-                elif signal['action'] == 'SELL' and position > 0:
-                    # Exit long position
-                    portfolio_value = position * current_price
-                    capital = portfolio_value
-                    self.trades.append({
-                        'type': 'EXIT',
-                        'time': current_time,
-                        'price': current_price,
-                        'portfolio_value': portfolio_value,
-                        'size': position,
-                        'pnl': (current_price - entry_price) * position
-                    })
-                    position = 0
-            
-            # Track portfolio value
-            current_value = capital if position == 0 else position * current_price
-            self.portfolio_value.append({
-                'timestamp': current_time,
-                'value': current_value
-            })
+        # Align every signal to the bars carrying its timestamp with one binary search over the
+        # (time-ordered) index, then visit those bars in bar order, keeping signal order within a bar
+        signal_times = pd.Index([signal['timestamp'] for signal in signals], dtype=index.dtype)
+        first = index.searchsorted(signal_times, side='left')
+        counts = index.searchsorted(signal_times, side='right') - first
+        signal_ids = np.repeat(np.arange(len(signals)), counts)
+        bars = first[signal_ids] + np.arange(len(signal_ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+        order = np.lexsort((signal_ids, bars))
+        codes = np.array([{'BUY': 1, 'SELL': -1}.get(signal['action'], 0) for signal in signals], dtype=np.int8)
+        
+        # Portfolio values and trades from one compiled pass over the signal events
+        values, trade_bars, prices, trade_values, sizes, pnls = _simulate(
+            close, bars[order].astype(np.int64), codes[signal_ids[order]], float(self.initial_capital)
+        )
         
+        for t, (i, price, portfolio_value, size, pnl) in enumerate(zip(trade_bars, prices, trade_values, sizes, pnls)):
+            trade = {
+                'type': 'ENTRY' if t % 2 == 0 else 'EXIT',
+                'time': index[i],
+                'price': price,
+                'portfolio_value': portfolio_value,
+                'size': size
+            }
+            if t % 2:
+                trade['pnl'] = pnl
+            self.trades.append(trade)
+        # Exits sit at the odd trade positions; entries carry no pnl
+        self.trade_pnls = np.concatenate((self.trade_pnls, pnls[1::2]))
+        
+        self.portfolio_value = pd.Series(values, index=data.index, name='value')
         return self.calculate_metrics()
     
     def calculate_metrics(self) -> dict:
         """Calculate backtest performance metrics"""
-        if not self.portfolio_value:
+        if self.portfolio_value.empty:
             return {
                 'total_return': 0,
                 'sharpe_ratio': 0,
@@ -76,27 +152,18 @@ class Backtester:
                 'total_trades': 0
             }
         
-        # Convert portfolio value to DataFrame
-        portfolio_df = pd.DataFrame(self.portfolio_value)
-        portfolio_df.set_index('timestamp', inplace=True)
-        
-        # Calculate returns
-        portfolio_df['returns'] = portfolio_df['value'].pct_change()
-        total_return = (portfolio_df['value'].iloc[-1] - self.initial_capital) / self.initial_capital
+        value = self.portfolio_value.to_numpy(dtype=np.float64)
+        total_return = (value[-1] - self.initial_capital) / self.initial_capital
         
-        # Calculate Sharpe ratio (assuming risk-free rate of 0.02)
+        # Returns, excess-return moments and drawdown from a single pass over the curve
+        # (assuming risk-free rate of 0.02)
         risk_free_rate = 0.02
-        excess_returns = portfolio_df['returns'] - risk_free_rate/252  # Daily risk-free rate
-        sharpe_ratio = np.sqrt(252) * excess_returns.mean() / excess_returns.std() if len(excess_returns) > 1 else 0
-        
-        # Calculate maximum drawdown
-        portfolio_df['cummax'] = portfolio_df['value'].cummax()
-        portfolio_df['drawdown'] = (portfolio_df['cummax'] - portfolio_df['value']) / portfolio_df['cummax']
-        max_drawdown = portfolio_df['drawdown'].max()
+        mean_excess, std_excess, max_drawdown = _equity_stats(value, risk_free_rate/252)  # Daily risk-free rate
+        sharpe_ratio = np.sqrt(252) * mean_excess / std_excess if len(value) > 1 else 0
         
         # Calculate win rate
-        profitable_trades = len([t for t in self.trades if t.get('pnl', 0) > 0])
-        total_trades = len([t for t in self.trades if t.get('pnl') is not None])
+        profitable_trades = int(np.count_nonzero(self.trade_pnls > 0))
+        total_trades = len(self.trade_pnls)
         win_rate = profitable_trades / total_trades if total_trades > 0 else 0
         
         return {
@@ -107,22 +174,22 @@ class Backtester:
             'total_trades': total_trades
         }
     
-    def plot_results(self) -> go.Figure:
+    def plot_results(self) -> "go.Figure":
         """Create interactive plot of backtest results"""
-        if not self.portfolio_value or not self.trades:
+        # Plotly is only needed here, so backtests that never plot skip importing it
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        
+        if self.portfolio_value.empty or not self.trades:
             return None
 
-        # Convert portfolio value list to DataFrame first
-        portfolio_df = pd.DataFrame(self.portfolio_value)
-        portfolio_df.set_index('timestamp', inplace=True)
-        
-        # Ensure portfolio value data is properly formatted
-        portfolio_df['value'] = pd.to_numeric(portfolio_df['value'], errors='coerce')
-        portfolio_df = portfolio_df.dropna(subset=['value'])
+        # Portfolio values are already a float series on the bar timestamps; drop bars without one
+        portfolio_df = self.portfolio_value.dropna().to_frame()
         
-        # Calculate drawdown data before plotting
-        portfolio_df['cummax'] = portfolio_df['value'].cummax()
-        portfolio_df['drawdown'] = (portfolio_df['cummax'] - portfolio_df['value']) / portfolio_df['cummax'] * 100
+        # Calculate drawdown data before plotting (running peak on the raw array; no NaNs left after dropna)
+        value = portfolio_df['value'].to_numpy()
+        peak = np.maximum.accumulate(value)
+        portfolio_df['drawdown'] = (peak - value) / peak * 100
         
         # Calculate y-axis ranges with improved padding
         min_value = portfolio_df['value'].min()
@@ -131,6 +198,20 @@ class Backtester:
         y_min = min_value - (value_range * 0.1)  # 10% padding
         y_max = max_value + (value_range * 0.1)
         
+        # Thin curves longer than PLOT_POINTS to at most about that many points for the browser, keeping
+        # the last bar and the value/drawdown extremes; the axis ranges above and the trade markers use
+        # the full series
+        step = -(-len(portfolio_df) // PLOT_POINTS)
+        if step > 1:
+            drawdown = portfolio_df['drawdown'].to_numpy()
+            keep = np.unique(np.r_[
+                np.arange(0, len(value), step), len(value) - 1,
+                np.argmin(value), np.argmax(value), np.argmax(drawdown)
+            ])
+            plot_df = portfolio_df.iloc[keep]
+        else:
+            plot_df = portfolio_df
+        
         # Create figure with increased spacing between subplots
         fig = make_subplots(
             rows=2, cols=1,
@@ -143,8 +224,8 @@ class Backtester:
         # Portfolio value line
         fig.add_trace(
             go.Scatter(
-                x=portfolio_df.index,
-                y=portfolio_df['value'],
+                x=plot_df.index,
+                y=plot_df['value'],
                 name='Portfolio Value',
                 line=dict(color='rgb(49,130,189)', width=2),
                 hovertemplate="Time: %{x}<br>Value: $%{y:,.2f}<extra></extra>",
@@ -216,8 +297,8 @@ class Backtester:
         # Drawdown subplot
         fig.add_trace(
             go.Scatter(
-                x=portfolio_df.index,
-                y=portfolio_df['drawdown'],
+                x=plot_df.index,
+                y=plot_df['drawdown'],
                 name='Drawdown',
                 fill='tozeroy',
                 line=dict(color='rgb(204,0,0)', width=2),
@@ -285,3 +366,8 @@ class Backtester:
         )
         
         return fig
+
+# Backtest inputs: the close column from pandas, signal bars and int8 action codes
+_close = pd.Series(np.linspace(1.0, 2.0, 32)).to_numpy(dtype=np.float64)
+warmup(_equity_stats, _close, 0.0)
+warmup(_simulate, _close, np.array([3, 9], dtype=np.int64), np.array([1, -1], dtype=np.int8), 10000.0)
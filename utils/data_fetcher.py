@@ -1,33 +1,94 @@
 import ccxt
 import pandas as pd
-from datetime import datetime, timedelta
+import numpy as np
+from functools import lru_cache
+from contextlib import nullcontext
+import threading
 
-def get_historical_data(exchange_name: str, symbol: str, timeframe: str, limit: int = 1000) -> pd.DataFrame:
+@lru_cache(maxsize=None)
+def get_exchange_client(exchange_name: str):
     """
-    Fetch historical OHLCV data from the specified exchange
+    Shared ccxt client per exchange, so markets and the HTTP session survive between calls
     """
-    try:
+    return getattr(ccxt, exchange_name)({'enableRateLimit': True})
 
-        exchange = getattr(ccxt, exchange_name)()
-        
-        # Fetch OHLCV data
-        ohlcv = exchange.fetch_ohlcv(
+@lru_cache(maxsize=None)
+def _client_lock(exchange_name: str) -> threading.Lock:
+    """
+    Lock serializing requests on the shared client; ccxt clients are not safe to call from several threads at once
+    """
+    return threading.Lock()
+
+# Candles requested per fetch_ohlcv call; exchanges cap a single response around this size
+OHLCV_PAGE = 1000
+
+def _fetch_ohlcv_pages(exchange, symbol: str, timeframe: str, since: int, limit: int) -> list:
+    """
+    fetch_ohlcv for any limit: longer histories are requested page by page, each starting
+    one candle after the last one received, instead of being truncated by the exchange
+    """
+    if limit <= OHLCV_PAGE:
+        return exchange.fetch_ohlcv(symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+    
+    timeframe_ms = exchange.parse_timeframe(timeframe) * 1000
+    now = exchange.milliseconds()
+    if since is None:
+        since = now - limit * timeframe_ms
+    
+    ohlcv = []
+    while len(ohlcv) < limit:
+        batch = exchange.fetch_ohlcv(
             symbol=symbol,
             timeframe=timeframe,
-            limit=limit
+            since=since,
+            limit=min(OHLCV_PAGE, limit - len(ohlcv))
         )
+        if not batch:
+            break
+        ohlcv.extend(batch)
+        since = batch[-1][0] + timeframe_ms
+        # The last page ends with the candle still forming
+        if since > now:
+            break
+    return ohlcv[-limit:]
+
+def get_historical_data(exchange_name: str, symbol: str, timeframe: str, limit: int = 1000, client=None,
+                        since: int = None) -> pd.DataFrame:
+    """
+    Fetch historical OHLCV data from the specified exchange; pass an existing ccxt
+    client to reuse its connection and loaded markets, and since (ms) to fetch only newer candles
+    """
+    try:
+
+        exchange = client if client is not None else get_exchange_client(exchange_name)
+        # Sessions share the cached client, so take turns on it; a caller's own client is theirs to manage
+        lock = _client_lock(exchange_name) if client is None else nullcontext()
         
-        # Convert to DataFrame
-        df = pd.DataFrame(
-            ohlcv,
-            columns=['timestamp', 'open', 'high', 'low', 'close', 'volume']
-        )
+        # Fetch OHLCV data
+        with lock:
+            ohlcv = _fetch_ohlcv_pages(exchange, symbol, timeframe, since, limit)
+        
+        # Convert to one float64 block, then build the DataFrame from typed columns
+        arr = np.asarray(ohlcv, dtype=np.float64).reshape(-1, 6)
         
         # Convert timestamp to datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.set_index('timestamp', inplace=True)
+        timestamp = pd.DatetimeIndex(pd.to_datetime(arr[:, 0].astype(np.int64), unit='ms'), name='timestamp')
+        df = pd.DataFrame(
+            {'open': arr[:, 1], 'high': arr[:, 2], 'low': arr[:, 3], 'close': arr[:, 4], 'volume': arr[:, 5]},
+            index=timestamp
+        )
         
         return df
         
     except Exception as e:
         raise Exception(f"Error fetching data: {str(e)}")
+
+def data_fingerprint(data: pd.DataFrame) -> tuple:
+    """
+    O(1) cache key for an OHLCV frame from get_historical_data.
+    Closed candles never change, so the span plus the still-forming last bar identifies the download.
+    """
+    if data.empty:
+        return (0,)
+    last = data.iloc[-1]
+    return (len(data), data.index[0].value, data.index[-1].value, float(last['close']), float(last['volume']))
@@ -0,0 +1,176 @@
+import numpy as np
+import pandas as pd
+from ._njit import njit, warmup
+
+@njit(cache=True, nogil=True)
+def rolling_mean_std(x: np.ndarray, window: int) -> tuple:
+    """
+    Rolling mean and sample standard deviation (ddof=1) in a single O(N) pass.
+    The first window-1 values are NaN, as is every window holding a NaN, matching pandas
+    rolling().mean()/std().
+    """
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    if window < 1 or window > n:
+        return mean, std
+
+    m = 0.0
+    m2 = 0.0
+    # Most recent NaN position, and whether m/m2 describe the window ending at the previous bar
+    last_nan = -1
+    tracking = False
+    for i in range(n):
+        if x[i] != x[i]:
+            last_nan = i
+        start = i - window + 1
+        if start < 0 or last_nan >= start:
+            tracking = False
+            continue
+        if not tracking:
+            # Welford warm-up over the first full window, or the first one clear of a NaN
+            m = 0.0
+            m2 = 0.0
+            for j in range(window):
+                delta = x[start + j] - m
+                m += delta / (j + 1)
+                m2 += delta * (x[start + j] - m)
+            tracking = True
+        elif start % window == 0:
+            # Every `window` steps the sums are rebuilt exactly so rounding error cannot
+            # accumulate; this keeps the total cost O(N)
+            m = 0.0
+            for j in range(start, i + 1):
+                m += x[j]
+            m /= window
+            m2 = 0.0
+            for j in range(start, i + 1):
+                m2 += (x[j] - m) * (x[j] - m)
+        else:
+            # Slide the window: add the new value and drop the oldest in one update
+            x_new = x[i]
+            x_old = x[i - window]
+            prev_m = m
+            m += (x_new - x_old) / window
+            m2 += (x_new - x_old) * (x_new - m + x_old - prev_m)
+            if m2 < 0.0:
+                m2 = 0.0
+        mean[i] = m
+        if window > 1:
+            std[i] = np.sqrt(m2 / (window - 1))
+
+    return mean, std
+
+@njit(cache=True, nogil=True)
+def multi_sma(x: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """
+    Simple moving averages for several periods in one pass over x.
+    Returns an array of shape (len(x), len(periods)), NaN until each window fills and while
+    a window holds a NaN, as with rolling().mean().
+    """
+    n = x.shape[0]
+    k = periods.shape[0]
+    out = np.full((n, k), np.nan)
+    # Sums of the finite values in each window, plus how many NaNs it holds
+    sums = np.zeros(k)
+    nans = np.zeros(k, dtype=np.int64)
+    for i in range(n):
+        v = x[i]
+        for j in range(k):
+            p = periods[j]
+            if v == v:
+                sums[j] += v
+            else:
+                nans[j] += 1
+            if i >= p:
+                old = x[i - p]
+                if old == old:
+                    sums[j] -= old
+                else:
+                    nans[j] -= 1
+            if i >= p - 1 and nans[j] == 0:
+                out[i, j] = sums[j] / p
+    return out
+
+@njit(cache=True, nogil=True)
+def wilder_rsi(close: np.ndarray, period: int) -> np.ndarray:
+    """
+    Wilder's RSI: average gain/loss seeded with the mean of the first `period` changes,
+    then smoothed recursively as avg = (avg * (period - 1) + change) / period.
+    The first `period` values are NaN. A NaN close blanks the RSI until `period` valid
+    changes have passed it, which re-seed the averages, as a rolling window would recover.
+    """
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    if period < 1 or period >= n:
+        return out
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    # Valid changes summed into the current seed; the averages are smoothed once it reaches period
+    seeded = 0
+    for i in range(1, n):
+        change = close[i] - close[i - 1]
+        if change != change:
+            avg_gain = 0.0
+            avg_loss = 0.0
+            seeded = 0
+            continue
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if seeded < period:
+            avg_gain += gain
+            avg_loss += loss
+            seeded += 1
+            if seeded < period:
+                continue
+            avg_gain /= period
+            avg_loss /= period
+        else:
+            avg_gain = (avg_gain * (period - 1) + gain) / period
+            avg_loss = (avg_loss * (period - 1) + loss) / period
+        # A flat window has no defined RSI; gains with no losses pin it at 100
+        if avg_loss > 0.0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0.0:
+            out[i] = 100.0
+    return out
+
+@njit(cache=True, nogil=True)
+def ema(x: np.ndarray, span: int) -> np.ndarray:
+    """
+    Exponential moving average with alpha = 2 / (span + 1), the recurrence behind pandas'
+    ewm(span=span, adjust=False).mean(): gaps carry the last value and age it, as ignore_na=False does.
+    """
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if n == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    old_wt_factor = 1.0 - alpha
+    weighted = x[0]
+    old_wt = 1.0
+    out[0] = weighted
+    for i in range(1, n):
+        cur = x[i]
+        is_obs = cur == cur
+        if weighted == weighted:
+            old_wt *= old_wt_factor
+            if is_obs:
+                # Same operation order as pandas, so the results match bit for bit
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif is_obs:
+            weighted = cur
+        out[i] = weighted
+    return out
+
+# Inputs as the strategies and charts pass them: price columns from pandas
+_x = pd.Series(np.linspace(1.0, 2.0, 32)).to_numpy(dtype=np.float64)
+warmup(rolling_mean_std, _x, 5)
+warmup(multi_sma, _x, np.array([5, 10], dtype=np.int64))
+warmup(wilder_rsi, _x, 14)
+warmup(ema, _x, 12)
+# The MACD signal line smooths a freshly computed array
+warmup(ema, _x * 1.0, 9)